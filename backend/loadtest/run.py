@@ -0,0 +1,508 @@
+"""End-to-end load test for the API with a stubbed model.
+
+Usage (from the backend directory):
+
+    python -m loadtest.run loadtest/scenarios/default.json --output report.json
+    python -m loadtest.run loadtest/scenarios/default.json --mode subprocess
+    python -m loadtest.run loadtest/scenarios/default.json --baseline old.json
+
+The scenario file sets the traffic mix, the concurrency stages to ramp
+through, the stub model latency and the per-endpoint SLOs. Exit status:
+
+    0  all SLOs met and no regression against the baseline
+    1  an SLO was violated or p99 regressed by more than --max-p99-regression
+    2  httpx is not installed or the scenario is invalid
+    3  the baseline used a different scenario file, mode, CPU count or
+       executor size; nothing was run
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from loadtest.stats import percentile
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - only needed for load runs
+    httpx = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENDPOINTS = {
+    "generate": "POST /api/generate-website",
+    "edit": "POST /api/website/{website_id}/edit",
+    "get_website": "GET /api/website/{website_id}",
+    "get_page": "GET /api/website/{website_id}/page/{page_name}",
+    "list": "GET /api/websites",
+}
+
+# Must match stub_app.DEFAULT_EXECUTOR_WORKERS; stub_app is only imported
+# in-process, so the runner keeps its own copy
+DEFAULT_EXECUTOR_WORKERS = 64
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    stage: int
+    start: float
+    end: float
+    ok: bool
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+
+def validate_scenario(scenario: Dict[str, Any]):
+    """Raise ValueError if the scenario can't be replayed as written"""
+    mix = scenario.get("mix") or {}
+    unknown = sorted(set(mix) - set(ENDPOINTS))
+    if unknown:
+        raise ValueError(
+            f"Unknown operations in mix: {', '.join(unknown)} "
+            f"(expected some of: {', '.join(ENDPOINTS)})"
+        )
+    if any(weight < 0 for weight in mix.values()) or sum(mix.values()) <= 0:
+        raise ValueError("Mix weights must be non-negative with a positive total")
+    # Reads and edits pick an existing website, so there must always be one
+    if scenario.get("seed_websites", 1) < 1:
+        raise ValueError("seed_websites must be at least 1")
+    if scenario.get("executor_workers", DEFAULT_EXECUTOR_WORKERS) < 1:
+        raise ValueError("executor_workers must be at least 1")
+    stages = scenario.get("stages") or []
+    if not stages or any(
+        stage["concurrency"] < 1 or stage["duration_s"] <= 0 for stage in stages
+    ):
+        raise ValueError("Stages need a concurrency >= 1 and a positive duration_s")
+
+
+class LoadRunner:
+    def __init__(self, scenario: Dict[str, Any], client: "httpx.AsyncClient"):
+        validate_scenario(scenario)
+        self.scenario = scenario
+        self.client = client
+        self.ops = list(scenario["mix"])
+        self.weights = [scenario["mix"][op] for op in self.ops]
+        self.websites: List[Tuple[str, List[str]]] = []
+        self.samples: List[Sample] = []
+
+    async def _generate(self) -> bool:
+        response = await self.client.post(
+            "/api/generate-website", json={"description": "A load test bakery"}
+        )
+        if response.status_code != 200:
+            return False
+        body = response.json()
+        self.websites.append(
+            (body["website_id"], [page["name"] for page in body["pages"]])
+        )
+        return True
+
+    async def _request(self, op: str, rng: random.Random) -> bool:
+        if op == "generate":
+            return await self._generate()
+        if op == "list":
+            response = await self.client.get("/api/websites")
+            return response.status_code == 200
+
+        website_id, page_names = rng.choice(self.websites)
+        if op == "get_website":
+            response = await self.client.get(f"/api/website/{website_id}")
+        elif op == "get_page":
+            page_name = rng.choice(page_names)
+            response = await self.client.get(
+                f"/api/website/{website_id}/page/{page_name}"
+            )
+        elif op == "edit":
+            response = await self.client.post(
+                f"/api/website/{website_id}/edit",
+                json={
+                    "page_name": rng.choice(page_names),
+                    "edit_instruction": "Make the header background dark blue",
+                },
+            )
+        else:
+            raise ValueError(f"Unknown operation '{op}' in scenario mix")
+        return response.status_code == 200
+
+    async def _worker(self, stage: int, deadline: float, rng: random.Random):
+        while time.perf_counter() < deadline:
+            op = rng.choices(self.ops, weights=self.weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = await self._request(op, rng)
+            except Exception as e:
+                print(f"{ENDPOINTS[op]} failed: {e!r}")
+                ok = False
+            self.samples.append(
+                Sample(ENDPOINTS[op], stage, start, time.perf_counter(), ok)
+            )
+
+    async def _loop_lag(self) -> Dict[str, float]:
+        """Event-loop lag the app saw since the last read, per the stub monitor"""
+        response = await self.client.get("/__loadtest/loop-lag")
+        response.raise_for_status()
+        stats = response.json()
+        return {
+            "loop_lag_p50_ms": stats["p50_ms"],
+            "loop_lag_p99_ms": stats["p99_ms"],
+            "loop_lag_max_ms": stats["max_ms"],
+        }
+
+    async def run(self) -> Dict[str, Any]:
+        response = await self.client.post("/__loadtest/setup")
+        response.raise_for_status()
+        executor_workers = response.json()["executor_workers"]
+
+        for _ in range(self.scenario.get("seed_websites", 1)):
+            if not await self._generate():
+                raise RuntimeError("Could not seed websites; is the stub installed?")
+
+        seed = self.scenario.get("seed", 0)
+        stages = []
+        for index, stage in enumerate(self.scenario["stages"]):
+            (await self.client.post("/__loadtest/loop-lag/reset")).raise_for_status()
+            started = time.perf_counter()
+            deadline = started + stage["duration_s"]
+            await asyncio.gather(
+                *(
+                    self._worker(
+                        index, deadline, random.Random(f"{seed}:{index}:{worker}")
+                    )
+                    for worker in range(stage["concurrency"])
+                )
+            )
+            summary = self._summarize(
+                [s for s in self.samples if s.stage == index],
+                time.perf_counter() - started,
+                concurrency=stage["concurrency"],
+            )
+            summary.update(await self._loop_lag())
+            stages.append(summary)
+
+        total_elapsed = sum(stage["elapsed_s"] for stage in stages)
+        endpoints = {}
+        for endpoint in ENDPOINTS.values():
+            samples = [s for s in self.samples if s.endpoint == endpoint]
+            if samples:
+                endpoints[endpoint] = self._summarize(samples, total_elapsed)
+        return {
+            "stages": stages,
+            "endpoints": endpoints,
+            "executor_workers": executor_workers,
+        }
+
+    def _summarize(
+        self, samples: List[Sample], elapsed: float, **extra: Any
+    ) -> Dict[str, Any]:
+        latencies = sorted(s.latency_ms for s in samples)
+        errors = sum(1 for s in samples if not s.ok)
+        summary = dict(extra)
+        summary.update(
+            {
+                "requests": len(samples),
+                "elapsed_s": round(elapsed, 3),
+                "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+                "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p90_ms": round(percentile(latencies, 0.90), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            }
+        )
+        return summary
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_until_ready(
+    client: "httpx.AsyncClient", server: subprocess.Popen, timeout: float = 30.0
+):
+    deadline = time.perf_counter() + timeout
+    while True:
+        if server.poll() is not None:
+            raise RuntimeError(
+                f"Server exited with status {server.returncode} during startup"
+            )
+        try:
+            response = await client.get("/api/websites")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.perf_counter() > deadline:
+            raise RuntimeError("Server did not become ready in time")
+        await asyncio.sleep(0.2)
+
+
+async def run_scenario(scenario: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    latency_ms = scenario.get("model_latency_ms", 0)
+    executor_workers = scenario.get("executor_workers", DEFAULT_EXECUTOR_WORKERS)
+    timeout = httpx.Timeout(scenario.get("request_timeout_s", 60))
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+    if mode == "inprocess":
+        if BACKEND_DIR not in sys.path:
+            sys.path.insert(0, BACKEND_DIR)
+        from loadtest import stub_app
+
+        stub_app.install_stub(latency_ms, executor_workers)
+        transport = httpx.ASGITransport(app=stub_app.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=timeout
+        ) as client:
+            return await LoadRunner(scenario, client).run()
+
+    port = _free_port()
+    env = dict(
+        os.environ,
+        LOADTEST_MODEL_LATENCY_MS=str(latency_ms),
+        LOADTEST_EXECUTOR_WORKERS=str(executor_workers),
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "loadtest.stub_app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=timeout, limits=limits
+        ) as client:
+            await _wait_until_ready(client, server)
+            return await LoadRunner(scenario, client).run()
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+            server.wait()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BACKEND_DIR,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def check_slos(report: Dict[str, Any], slos: Dict[str, Dict[str, float]]) -> List[str]:
+    """Return a message for every endpoint that misses its SLO"""
+    violations = []
+    default = slos.get("default", {})
+    for endpoint, stats in report["endpoints"].items():
+        # Endpoint entries override individual default limits, not all of them
+        slo = {**default, **slos.get(endpoint, {})}
+        if "p99_ms" in slo and stats["p99_ms"] > slo["p99_ms"]:
+            violations.append(
+                f"{endpoint}: p99 {stats['p99_ms']}ms > {slo['p99_ms']}ms"
+            )
+        if "error_rate" in slo and stats["error_rate"] > slo["error_rate"]:
+            violations.append(
+                f"{endpoint}: error rate {stats['error_rate']} > {slo['error_rate']}"
+            )
+    return violations
+
+
+def _cpu_count() -> Optional[int]:
+    """CPUs this process may run on (respects taskset/cgroup affinity)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count()
+
+
+# Metadata that must match for two reports to be comparable
+COMPARABLE_METADATA = {
+    "scenario_sha256": "scenario file",
+    "mode": "mode",
+    "cpu_count": "CPU count",
+    "executor_workers": "executor size",
+}
+
+
+def baseline_mismatches(
+    baseline: Dict[str, Any], expected: Dict[str, Any]
+) -> List[str]:
+    """Return why a baseline cannot be compared with this run, if it can't"""
+    mismatches = []
+    for key, label in COMPARABLE_METADATA.items():
+        if baseline["metadata"].get(key) != expected[key]:
+            mismatches.append(
+                f"baseline used a different {label} "
+                f"({baseline['metadata'].get(key)} vs {expected[key]})"
+            )
+    return mismatches
+
+
+def check_regressions(
+    report: Dict[str, Any], baseline: Dict[str, Any], max_p99_regression: float
+) -> List[str]:
+    """Return a message for every endpoint whose p99 grew beyond the allowance"""
+    regressions = []
+    for endpoint, stats in report["endpoints"].items():
+        before = baseline["endpoints"].get(endpoint)
+        if not before or not before["p99_ms"]:
+            continue
+        change = stats["p99_ms"] / before["p99_ms"] - 1
+        if change > max_p99_regression:
+            regressions.append(
+                f"{endpoint}: p99 {before['p99_ms']}ms -> {stats['p99_ms']}ms "
+                f"(+{change:.0%})"
+            )
+    return regressions
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    meta = report["metadata"]
+    print(
+        f"\nScenario '{meta['scenario']}' ({meta['mode']}) at {meta['git_commit'] or 'unknown commit'}"
+    )
+    if meta["loop_lag_source"] == "shared":
+        print("Loop lag is from the loop shared by the app and the load generator")
+    print("\nStages:")
+    for stage in report["stages"]:
+        print(
+            f"  c={stage['concurrency']:<4} {stage['throughput_rps']:>9.1f} rps  "
+            f"p50 {stage['p50_ms']:>8.1f}ms  p99 {stage['p99_ms']:>8.1f}ms  "
+            f"errors {stage['error_rate']:.2%}  "
+            f"loop lag p99 {stage['loop_lag_p99_ms']:>6.1f}ms max {stage['loop_lag_max_ms']:>6.1f}ms"
+        )
+
+    print("\nEndpoints:")
+    header = f"  {'endpoint':<48} {'reqs':>6} {'rps':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'err':>7}"
+    if baseline:
+        header += f" {'p99 Δ':>8}"
+    print(header)
+    for endpoint, stats in report["endpoints"].items():
+        line = (
+            f"  {endpoint:<48} {stats['requests']:>6} {stats['throughput_rps']:>8.1f} "
+            f"{stats['p50_ms']:>8.1f} {stats['p90_ms']:>8.1f} {stats['p99_ms']:>8.1f} "
+            f"{stats['error_rate']:>7.2%}"
+        )
+        before = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if before and before["p99_ms"]:
+            line += f" {stats['p99_ms'] / before['p99_ms'] - 1:>+8.0%}"
+        print(line)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the API with a stubbed model")
+    parser.add_argument("scenario", help="Path to a scenario JSON file")
+    parser.add_argument(
+        "--mode",
+        choices=["inprocess", "subprocess"],
+        default="inprocess",
+        help="Serve the app in this process over ASGI, or under uvicorn in a subprocess",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument(
+        "--max-p99-regression",
+        type=float,
+        default=0.2,
+        help="Allowed relative p99 increase over the baseline (default: 0.2)",
+    )
+    args = parser.parse_args(argv)
+
+    if httpx is None:
+        print("The load test needs httpx: pip install httpx")
+        return 2
+
+    with open(args.scenario, "rb") as f:
+        raw = f.read()
+    scenario = json.loads(raw)
+    try:
+        validate_scenario(scenario)
+    except ValueError as e:
+        print(f"Invalid scenario {args.scenario}: {e}")
+        return 2
+    comparable = {
+        "scenario_sha256": hashlib.sha256(raw).hexdigest(),
+        "mode": args.mode,
+        "cpu_count": _cpu_count(),
+        "executor_workers": scenario.get(
+            "executor_workers", DEFAULT_EXECUTOR_WORKERS
+        ),
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatches = baseline_mismatches(baseline, comparable)
+        if mismatches:
+            for mismatch in mismatches:
+                print(f"Cannot compare against {args.baseline}: {mismatch}")
+            return 3
+
+    report = asyncio.run(run_scenario(scenario, args.mode))
+    executor_workers = report.pop("executor_workers")
+    if executor_workers != comparable["executor_workers"]:
+        raise RuntimeError(
+            f"Stub reported {executor_workers} executor workers, "
+            f"expected {comparable['executor_workers']}"
+        )
+    report["metadata"] = {
+        "scenario": scenario.get("name", os.path.basename(args.scenario)),
+        **comparable,
+        # In-process the app shares its event loop with the load generator
+        "loop_lag_source": "shared" if args.mode == "inprocess" else "server",
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "created_at": datetime.now().isoformat(),
+    }
+    report["slo_violations"] = check_slos(report, scenario.get("slo", {}))
+
+    if baseline is not None:
+        report["regressions"] = check_regressions(
+            report, baseline, args.max_p99_regression
+        )
+
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+
+    failures = report["slo_violations"] + report.get("regressions", [])
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
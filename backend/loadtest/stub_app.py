@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+# routes.py builds a GeminiAIService at import time; give it a dummy key so the
+# import succeeds. The real backend is swapped out below and never called.
+os.environ.setdefault("GEMINI_API_KEY", "loadtest-stub")
+
+from fastapi import APIRouter
+
+from api import routes
+from loadtest.stats import percentile
+from main import app
+from services.ai_service import GeminiAIService
+from services.model_backends import FakeBackend
+from storage.website_storage import WebsiteStorage
+
+STUB_PAGES = ["Home", "About", "Contact"]
+LOOP_LAG_INTERVAL = 0.01
+# asyncio.to_thread defaults to min(32, cpu_count + 4) workers, which makes
+# model-bound latency depend on the host; the stub pins it instead
+DEFAULT_EXECUTOR_WORKERS = 64
+
+
+def _stub_html(title: str) -> str:
+    sections = "\n".join(
+        f"<section><h2>Section {i}</h2><p>{'Lorem ipsum dolor sit amet. ' * 12}</p></section>"
+        for i in range(8)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="UTF-8"><title>{title}</title></head>
+<body style="font-family: sans-serif; margin: 0; padding: 20px;">
+<header><h1>{title}</h1></header>
+<main>
+{sections}
+</main>
+</body>
+</html>"""
+
+
+def make_responder(latency_ms: float):
+    """Build a FakeBackend responder that mimics Gemini's output shapes"""
+    website_json = json.dumps(
+        {
+            "pages": [
+                {
+                    "name": name,
+                    "slug": name.lower(),
+                    "html": _stub_html(name),
+                    "description": f"{name} page",
+                }
+                for name in STUB_PAGES
+            ]
+        }
+    )
+    page_html = _stub_html("Edited page")
+
+    def responder(prefix: str, suffix: str, cache_key: str) -> str:
+        # Runs in the worker thread, like the blocking Gemini SDK call
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        if cache_key.startswith("generate_website@"):
+            return website_json
+        return page_html
+
+    return responder
+
+
+class ExecutorPin:
+    """Gives the app's event loop a default executor of a fixed size"""
+
+    def __init__(self, max_workers: int = DEFAULT_EXECUTOR_WORKERS):
+        self.max_workers = max_workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def configure(self, max_workers: int):
+        self.max_workers = max_workers
+        self._loop = None
+
+    def ensure_pinned(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            loop.set_default_executor(
+                ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="loadtest"
+                )
+            )
+            self._loop = loop
+
+
+executor = ExecutorPin()
+
+
+def install_stub(
+    latency_ms: float = 0.0, executor_workers: int = DEFAULT_EXECUTOR_WORKERS
+) -> FakeBackend:
+    """Point the API routes at a FakeBackend and a fresh in-memory storage"""
+    backend = FakeBackend(make_responder(latency_ms))
+    routes.ai_service = GeminiAIService(backend=backend)
+    routes.storage = WebsiteStorage()
+    executor.configure(executor_workers)
+    return backend
+
+
+class LoopLagMonitor:
+    """Samples how late the app's event loop wakes up from a short sleep"""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_running(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    def drain(self) -> List[float]:
+        samples, self.samples = self.samples, []
+        return samples
+
+
+loop_lag = LoopLagMonitor()
+stub_router = APIRouter()
+
+
+@stub_router.post("/setup")
+async def setup():
+    """Pin the executor and start the lag monitor before any traffic"""
+    executor.ensure_pinned()
+    loop_lag.ensure_running()
+    return {"executor_workers": executor.max_workers}
+
+
+@stub_router.post("/loop-lag/reset")
+async def reset_loop_lag():
+    loop_lag.ensure_running()
+    loop_lag.drain()
+    return {"success": True}
+
+
+@stub_router.get("/loop-lag")
+async def read_loop_lag():
+    lags = sorted(loop_lag.drain())
+    return {
+        "samples": len(lags),
+        "p50_ms": round(percentile(lags, 0.50), 2),
+        "p99_ms": round(percentile(lags, 0.99), 2),
+        "max_ms": round(lags[-1], 2) if lags else 0.0,
+    }
+
+
+# Only exists on the stubbed app, never on the deployed one
+app.include_router(stub_router, prefix="/__loadtest")
+
+backend = install_stub(
+    float(os.getenv("LOADTEST_MODEL_LATENCY_MS", "0")),
+    int(os.getenv("LOADTEST_EXECUTOR_WORKERS", str(DEFAULT_EXECUTOR_WORKERS))),
+)
+
+__all__ = ["app", "backend", "install_stub", "loop_lag", "STUB_PAGES"]
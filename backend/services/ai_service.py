@@ -1,23 +1,35 @@
 import google.generativeai as genai
 import os
 import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 import asyncio
 import re
+from services.model_backends import GeminiBackend
+from services.prompts import PromptTemplate, prompt_registry
 
 load_dotenv()
 
 
 class GeminiAIService:
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
-
-        genai.configure(api_key=api_key)
-        # Updated model name - use gemini-1.5-flash for better performance
-        self.model = genai.GenerativeModel("gemini-1.5-flash")
+    def __init__(self, backend: Optional[Any] = None):
+        if backend is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise ValueError("GEMINI_API_KEY environment variable is required")
+
+            genai.configure(api_key=api_key)
+            # Updated model name - use gemini-1.5-flash for better performance
+            backend = GeminiBackend("gemini-1.5-flash")
+        self.backend = backend
+
+    async def _generate(self, template: PromptTemplate, **values: str) -> str:
+        """Render the variable suffix and send it with the template's static prefix"""
+        suffix = template.render_suffix(**values)
+        # Run the sync backend call in a thread pool to make it async
+        return await asyncio.to_thread(
+            self.backend.generate, template.prefix, suffix, template.cache_key
+        )
 
     def _strip_code_fences(self, text: str) -> str:
         """Remove Markdown-style code fences from AI response."""
@@ -26,54 +38,12 @@ class GeminiAIService:
     async def generate_website(self, description: str) -> Dict[str, Any]:
         """Generate a complete website based on description"""
 
-        system_prompt = """You are an expert web developer. Generate a complete website based on the user's description.
-
-IMPORTANT: Return ONLY a valid JSON object with this exact structure (no additional text before or after):
-
-{
-  "pages": [
-    {
-      "name": "Home",
-      "slug": "home",
-      "html": "complete HTML with inline CSS",
-      "description": "Brief description of the page"
-    }
-  ]
-}
-
-Guidelines for HTML generation:
-- Create modern, responsive HTML with inline CSS
-- Use semantic HTML5 elements (header, nav, main, section, footer)
-- Include proper meta tags and viewport
-- Make it visually appealing with good typography and spacing
-- Use CSS Grid/Flexbox for layouts
-- Include hover effects and smooth transitions
-- Make text content relevant to the description
-- Ensure mobile-responsive design
-- Use modern color schemes and gradients
-- Include proper spacing and typography
-- Create multiple pages based on the description (typically 3-5 pages)
-
-Example page types to include based on description:
-- Home/Landing page
-- About/Services page  
-- Contact page
-- Portfolio/Gallery (if relevant)
-- Products/Menu (if relevant)
-- Blog/News (if relevant)
-
-Make the content realistic and relevant to the described business/purpose."""
-
-        user_prompt = f"Create a website: {description}"
-
         try:
-            # Run the sync method in a thread pool to make it async
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                f"{system_prompt}\n\nUser Request: {user_prompt}",
+            response_text = await self._generate(
+                prompt_registry.get("generate_website"), description=description
             )
 
-            content = response.text.strip()
+            content = response_text.strip()
 
             # Extract JSON from response (in case there's extra text)
             json_match = re.search(r"\{.*\}", content, re.DOTALL)
@@ -120,33 +90,14 @@ Make the content realistic and relevant to the described business/purpose."""
                 "error": f"Page '{page_name}' not found",
             }
 
-        system_prompt = """You are an expert web developer. Edit the provided HTML/CSS based on the user's instruction.
-
-IMPORTANT: Return ONLY the updated HTML with inline CSS (no additional text before or after).
-
-Guidelines:
-- Maintain responsive design
-- Keep existing content unless specifically asked to change it
-- Apply modern web design principles
-- Ensure the changes are visually appealing
-- Preserve the overall structure and functionality
-- Make sure all CSS is inline within the HTML
-- Keep semantic HTML5 structure"""
-
-        user_prompt = f"""Current HTML:
-{target_page['html']}
-
-Edit instruction: {edit_instruction}
-
-Return the complete updated HTML:"""
-
         try:
-            # Run the sync method in a thread pool to make it async
-            response = await asyncio.to_thread(
-                self.model.generate_content, f"{system_prompt}\n\n{user_prompt}"
+            response_text = await self._generate(
+                prompt_registry.get("edit_page"),
+                html=target_page["html"],
+                edit_instruction=edit_instruction,
             )
 
-            updated_html = response.text.strip()
+            updated_html = response_text.strip()
 
             # Clean up the response (remove any markdown formatting)
             updated_html = re.sub(r"^```html\s*", "", updated_html)
@@ -304,33 +255,15 @@ Return the complete updated HTML:"""
     ) -> str:
         """Generate a single page HTML"""
 
-        system_prompt = """You are an expert web developer. Generate a single HTML page based on the description.
-
-IMPORTANT: Return ONLY the complete HTML with inline CSS (no additional text before or after).
-
-Guidelines:
-- Create modern, responsive HTML with inline CSS
-- Use semantic HTML5 elements
-- Include proper meta tags and viewport
-- Make it visually appealing with good typography and spacing
-- Use CSS Grid/Flexbox for layouts
-- Include hover effects and transitions
-- Ensure mobile-responsive design
-- Use modern color schemes
-- Make content relevant to the page purpose"""
-
-        user_prompt = f"""Page Name: {page_name}
-Page Description: {page_description}
-Website Context: {website_context}
-
-Generate a complete HTML page:"""
-
         try:
-            response = await asyncio.to_thread(
-                self.model.generate_content, f"{system_prompt}\n\n{user_prompt}"
+            response_text = await self._generate(
+                prompt_registry.get("generate_page"),
+                page_name=page_name,
+                page_description=page_description,
+                website_context=website_context,
             )
 
-            html_content = response.text.strip()
+            html_content = response_text.strip()
 
             # Clean up markdown formatting
             html_content = re.sub(r"^```html\s*", "", html_content)
@@ -412,35 +345,15 @@ Generate a complete HTML page:"""
     ) -> str:
         """Optimize HTML for SEO"""
 
-        system_prompt = """You are an SEO expert. Optimize the provided HTML for search engines.
-
-IMPORTANT: Return ONLY the optimized HTML (no additional text before or after).
-
-SEO optimizations to apply:
-- Add/improve meta description
-- Add proper title tag
-- Add meta keywords (if missing)
-- Ensure proper heading hierarchy (h1, h2, h3)
-- Add alt attributes to images
-- Optimize for page speed
-- Add structured data if relevant
-- Ensure semantic HTML structure
-- Add Open Graph tags for social sharing"""
-
-        user_prompt = f"""Page Name: {page_name}
-Description: {description}
-
-HTML to optimize:
-{html_content}
-
-Return the SEO-optimized HTML:"""
-
         try:
-            response = await asyncio.to_thread(
-                self.model.generate_content, f"{system_prompt}\n\n{user_prompt}"
+            response_text = await self._generate(
+                prompt_registry.get("optimize_seo"),
+                page_name=page_name,
+                description=description,
+                html_content=html_content,
             )
 
-            optimized_html = response.text.strip()
+            optimized_html = response_text.strip()
 
             # Clean up formatting
             optimized_html = re.sub(r"^```html\s*", "", optimized_html)
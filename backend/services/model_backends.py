@@ -0,0 +1,194 @@
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+# Gemini only caches contexts for explicitly versioned models
+# ("gemini-1.5-flash-001") and prefixes of at least this many tokens.
+MIN_CACHE_TOKENS = 32768
+# Rough chars-per-token ratio, used to skip prefixes that are clearly too short
+CHARS_PER_TOKEN = 4
+# Rebuild a cache this long before its TTL runs out
+CACHE_REFRESH_MARGIN = timedelta(minutes=5)
+# Wait this long before retrying a cache creation that failed transiently
+CACHE_RETRY_BACKOFF = timedelta(minutes=1)
+# Errors that mean a prefix can never be cached (too small, unsupported model)
+PERMANENT_CACHE_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.FailedPrecondition,
+    google_exceptions.NotFound,
+    google_exceptions.PermissionDenied,
+)
+
+
+@dataclass
+class _PrefixCache:
+    content: Any
+    model: "genai.GenerativeModel"
+    expires_at: float
+
+
+class GeminiBackend:
+    """Calls Gemini, reusing a server-side context cache for static prefixes.
+
+    A prefix is only cached when the installed SDK exposes ``genai.caching``,
+    the model name is versioned and the prefix meets Gemini's minimum
+    cacheable size. None of that holds in this tree today: the pinned SDK
+    (0.3.2) has no ``genai.caching``, the service uses the unversioned
+    "gemini-1.5-flash" and the registered prompts are a few hundred tokens.
+    So this backend currently sends the full prompt on every call and only
+    FakeBackend shows the prefix saving. Prefixes the API refuses to cache
+    are remembered and always sent in full; transient failures are retried
+    after a backoff, while any existing cache stays in use until it expires.
+    """
+
+    def __init__(self, model_name: str, cache_ttl: timedelta = timedelta(hours=1)):
+        self.model_name = model_name
+        self.cache_ttl = cache_ttl
+        self.model = genai.GenerativeModel(model_name)
+        self._caches: Dict[str, _PrefixCache] = {}
+        self._uncacheable: Set[str] = set()
+        self._retry_at: Dict[str, float] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def supports_prefix_cache(self) -> bool:
+        return hasattr(genai, "caching") and bool(
+            re.search(r"-\d{3}$", self.model_name)
+        )
+
+    def _cache_eligible(self, prefix: str) -> bool:
+        return (
+            self.supports_prefix_cache
+            and len(prefix) // CHARS_PER_TOKEN >= MIN_CACHE_TOKENS
+        )
+
+    def _key_lock(self, cache_key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(cache_key, threading.Lock())
+
+    def _delete(self, cache: _PrefixCache):
+        try:
+            cache.content.delete()
+        except Exception as e:
+            print(f"Could not delete prefix cache {cache.content.name}: {e}")
+
+    def _cached_model(self, prefix: str, cache_key: str):
+        """Get a model bound to a live cached prefix, or None"""
+        if not self._cache_eligible(prefix):
+            return None
+
+        # Only calls for the same prefix wait on each other while it is created
+        with self._key_lock(cache_key):
+            now = time.monotonic()
+            cache = self._caches.get(cache_key)
+            if cache is not None and now >= cache.expires_at:
+                del self._caches[cache_key]
+                cache = None
+            live_model = cache.model if cache is not None else None
+
+            refresh_at = now + CACHE_REFRESH_MARGIN.total_seconds()
+            if cache is not None and refresh_at < cache.expires_at:
+                return live_model
+            if cache_key in self._uncacheable or now < self._retry_at.get(
+                cache_key, 0.0
+            ):
+                return live_model
+
+            try:
+                content = genai.caching.CachedContent.create(
+                    model=self.model_name,
+                    display_name=cache_key,
+                    system_instruction=prefix,
+                    ttl=self.cache_ttl,
+                )
+                model = genai.GenerativeModel.from_cached_content(content)
+            except PERMANENT_CACHE_ERRORS as e:
+                print(f"Prefix cache unavailable for {cache_key}: {e}")
+                self._uncacheable.add(cache_key)
+                return live_model
+            except Exception as e:
+                print(f"Could not create prefix cache for {cache_key}, will retry: {e}")
+                self._retry_at[cache_key] = now + CACHE_RETRY_BACKOFF.total_seconds()
+                return live_model
+
+            self._retry_at.pop(cache_key, None)
+            self._caches[cache_key] = _PrefixCache(
+                content, model, time.monotonic() + self.cache_ttl.total_seconds()
+            )
+            # Only drop the old cache once its replacement exists
+            if cache is not None:
+                self._delete(cache)
+            return model
+
+    def _invalidate(self, cache_key: str, model: "genai.GenerativeModel"):
+        """Forget a cache the server no longer has"""
+        with self._key_lock(cache_key):
+            cache = self._caches.get(cache_key)
+            if cache is not None and cache.model is model:
+                del self._caches[cache_key]
+
+    @staticmethod
+    def _is_missing_cache(error: Exception) -> bool:
+        if isinstance(error, google_exceptions.NotFound):
+            return True
+        # Gemini reports an unknown or expired cache as "CachedContent not
+        # found (or permission denied)"
+        return isinstance(
+            error, google_exceptions.PermissionDenied
+        ) and "CachedContent" in str(error)
+
+    def generate(self, prefix: str, suffix: str, cache_key: str) -> str:
+        """Generate text for ``prefix + suffix``; blocking"""
+        cached_model = self._cached_model(prefix, cache_key)
+        if cached_model is not None:
+            try:
+                return cached_model.generate_content(suffix).text
+            except Exception as e:
+                if not self._is_missing_cache(e):
+                    raise
+                print(f"Prefix cache for {cache_key} is gone: {e}")
+                self._invalidate(cache_key, cached_model)
+
+        return self.model.generate_content(prefix + suffix).text
+
+
+class FakeBackend:
+    """In-memory stand-in for GeminiBackend used in tests and load runs.
+
+    It honours the prefix cache the same way the real backend does: the first
+    call for a ``cache_key`` is billed for prefix and suffix, later calls only
+    for the suffix. Billing is counted in characters.
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[str, str, str], str]] = None,
+        prefix_cache: bool = True,
+    ):
+        self.responder = responder or (lambda prefix, suffix, cache_key: "")
+        self.supports_prefix_cache = prefix_cache
+        self.calls: List[Dict[str, str]] = []
+        self.cached_prefixes: Dict[str, str] = {}
+        self.billed_chars = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prefix: str, suffix: str, cache_key: str) -> str:
+        with self._lock:
+            billed = len(suffix)
+            if not self.supports_prefix_cache:
+                billed += len(prefix)
+            elif self.cached_prefixes.get(cache_key) != prefix:
+                self.cached_prefixes[cache_key] = prefix
+                billed += len(prefix)
+            self.billed_chars += billed
+            self.calls.append(
+                {"cache_key": cache_key, "prefix": prefix, "suffix": suffix}
+            )
+        return self.responder(prefix, suffix, cache_key)
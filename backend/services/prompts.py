@@ -0,0 +1,233 @@
+import keyword
+from dataclasses import dataclass, field
+from string import Formatter
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A versioned prompt made of a static prefix and a variable suffix.
+
+    The prefix (system prompt plus separator) never changes between calls, so
+    it is built once here and can be handed to the backend as a cache key for
+    model-side context caching. Only the suffix is rendered per request.
+
+    ``render_suffix(**values)`` is compiled from ``user`` when the template is
+    created: it is a function wrapping a single f-string, so rendering costs
+    about as much as the inline f-strings it replaced.
+    """
+
+    name: str
+    version: str
+    system: str
+    user: str
+    separator: str = "\n\n"
+    prefix: str = field(init=False)
+    render_suffix: Callable[..., str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "prefix", f"{self.system}{self.separator}")
+
+        # Only bare named fields are supported; anything else would render
+        # differently from str.format
+        pieces = []
+        fields = []
+        for literal, field_name, format_spec, conversion in Formatter().parse(
+            self.user
+        ):
+            if literal:
+                pieces.append(repr(literal))
+            if field_name is None:
+                continue
+            if (
+                not field_name.isidentifier()
+                or keyword.iskeyword(field_name)
+                or format_spec
+                or conversion
+            ):
+                raise ValueError(
+                    f"Prompt '{self.name}' field "
+                    f"'{{{field_name}{'!' + conversion if conversion else ''}"
+                    f"{':' + format_spec if format_spec else ''}}}' is not supported; "
+                    "use plain named fields like '{name}'"
+                )
+            pieces.append(f"f'{{{field_name}}}'")
+            if field_name not in fields:
+                fields.append(field_name)
+
+        params = f"*, {', '.join(fields)}" if fields else ""
+        body = " ".join(pieces) if pieces else "''"
+        # Plain literals next to f-strings are not parsed for braces, so the
+        # literal pieces are used as-is and substituted values never re-parsed
+        source = f"lambda {params}: f'' {body}"
+        object.__setattr__(
+            self, "render_suffix", eval(source, {"__builtins__": {}})
+        )
+
+    @property
+    def cache_key(self) -> str:
+        """Stable identifier for the static prefix"""
+        return f"{self.name}@{self.version}"
+
+    def render(self, **values: str) -> str:
+        """Render the full prompt (prefix + suffix)"""
+        return self.prefix + self.render_suffix(**values)
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._templates: Dict[str, Dict[str, PromptTemplate]] = {}
+        self._latest: Dict[str, str] = {}
+
+    def register(self, template: PromptTemplate, latest: bool = True) -> PromptTemplate:
+        """Register a template version, by default making it the active one"""
+        versions = self._templates.setdefault(template.name, {})
+        if template.version in versions:
+            raise ValueError(
+                f"Prompt '{template.name}' version '{template.version}' already registered"
+            )
+        versions[template.version] = template
+        if latest or template.name not in self._latest:
+            self._latest[template.name] = template.version
+        return template
+
+    def get(self, name: str, version: Optional[str] = None) -> PromptTemplate:
+        """Get a template by name, defaulting to its active version"""
+        versions = self._templates.get(name)
+        if not versions:
+            raise KeyError(f"Prompt '{name}' not registered")
+        version = version or self._latest[name]
+        if version not in versions:
+            raise KeyError(f"Prompt '{name}' has no version '{version}'")
+        return versions[version]
+
+    def versions(self, name: str) -> List[str]:
+        """List the registered versions of a template"""
+        return list(self._templates.get(name, {}))
+
+
+prompt_registry = PromptRegistry()
+
+GENERATE_WEBSITE = prompt_registry.register(
+    PromptTemplate(
+        name="generate_website",
+        version="1",
+        system="""You are an expert web developer. Generate a complete website based on the user's description.
+
+IMPORTANT: Return ONLY a valid JSON object with this exact structure (no additional text before or after):
+
+{
+  "pages": [
+    {
+      "name": "Home",
+      "slug": "home",
+      "html": "complete HTML with inline CSS",
+      "description": "Brief description of the page"
+    }
+  ]
+}
+
+Guidelines for HTML generation:
+- Create modern, responsive HTML with inline CSS
+- Use semantic HTML5 elements (header, nav, main, section, footer)
+- Include proper meta tags and viewport
+- Make it visually appealing with good typography and spacing
+- Use CSS Grid/Flexbox for layouts
+- Include hover effects and smooth transitions
+- Make text content relevant to the description
+- Ensure mobile-responsive design
+- Use modern color schemes and gradients
+- Include proper spacing and typography
+- Create multiple pages based on the description (typically 3-5 pages)
+
+Example page types to include based on description:
+- Home/Landing page
+- About/Services page  
+- Contact page
+- Portfolio/Gallery (if relevant)
+- Products/Menu (if relevant)
+- Blog/News (if relevant)
+
+Make the content realistic and relevant to the described business/purpose.""",
+        user="User Request: Create a website: {description}",
+    )
+)
+
+EDIT_PAGE = prompt_registry.register(
+    PromptTemplate(
+        name="edit_page",
+        version="1",
+        system="""You are an expert web developer. Edit the provided HTML/CSS based on the user's instruction.
+
+IMPORTANT: Return ONLY the updated HTML with inline CSS (no additional text before or after).
+
+Guidelines:
+- Maintain responsive design
+- Keep existing content unless specifically asked to change it
+- Apply modern web design principles
+- Ensure the changes are visually appealing
+- Preserve the overall structure and functionality
+- Make sure all CSS is inline within the HTML
+- Keep semantic HTML5 structure""",
+        user="""Current HTML:
+{html}
+
+Edit instruction: {edit_instruction}
+
+Return the complete updated HTML:""",
+    )
+)
+
+GENERATE_PAGE = prompt_registry.register(
+    PromptTemplate(
+        name="generate_page",
+        version="1",
+        system="""You are an expert web developer. Generate a single HTML page based on the description.
+
+IMPORTANT: Return ONLY the complete HTML with inline CSS (no additional text before or after).
+
+Guidelines:
+- Create modern, responsive HTML with inline CSS
+- Use semantic HTML5 elements
+- Include proper meta tags and viewport
+- Make it visually appealing with good typography and spacing
+- Use CSS Grid/Flexbox for layouts
+- Include hover effects and transitions
+- Ensure mobile-responsive design
+- Use modern color schemes
+- Make content relevant to the page purpose""",
+        user="""Page Name: {page_name}
+Page Description: {page_description}
+Website Context: {website_context}
+
+Generate a complete HTML page:""",
+    )
+)
+
+OPTIMIZE_SEO = prompt_registry.register(
+    PromptTemplate(
+        name="optimize_seo",
+        version="1",
+        system="""You are an SEO expert. Optimize the provided HTML for search engines.
+
+IMPORTANT: Return ONLY the optimized HTML (no additional text before or after).
+
+SEO optimizations to apply:
+- Add/improve meta description
+- Add proper title tag
+- Add meta keywords (if missing)
+- Ensure proper heading hierarchy (h1, h2, h3)
+- Add alt attributes to images
+- Optimize for page speed
+- Add structured data if relevant
+- Ensure semantic HTML structure
+- Add Open Graph tags for social sharing""",
+        user="""Page Name: {page_name}
+Description: {description}
+
+HTML to optimize:
+{html_content}
+
+Return the SEO-optimized HTML:""",
+    )
+)
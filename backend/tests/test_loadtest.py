@@ -0,0 +1,164 @@
+import asyncio
+import time
+
+import pytest
+
+from loadtest import run
+from loadtest.stats import percentile
+from loadtest.stub_app import LoopLagMonitor
+
+GENERATE = run.ENDPOINTS["generate"]
+LIST = run.ENDPOINTS["list"]
+
+
+def _scenario(**overrides):
+    scenario = {
+        "name": "test",
+        "seed": 1,
+        "model_latency_ms": 0,
+        "executor_workers": 4,
+        "seed_websites": 1,
+        "mix": {op: 1 for op in run.ENDPOINTS},
+        "stages": [
+            {"concurrency": 1, "duration_s": 0.2},
+            {"concurrency": 3, "duration_s": 0.2},
+        ],
+    }
+    scenario.update(overrides)
+    return scenario
+
+
+def _report(**endpoints):
+    return {
+        "endpoints": {
+            endpoint: {"p99_ms": p99, "error_rate": error_rate}
+            for endpoint, (p99, error_rate) in endpoints.items()
+        }
+    }
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 1.0) == 100.0
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile([], 0.99) == 0.0
+
+
+def test_check_slos_uses_default_for_unlisted_endpoints():
+    report = _report(**{LIST: (600.0, 0.0), GENERATE: (100.0, 0.0)})
+    slos = {"default": {"p99_ms": 500}}
+
+    violations = run.check_slos(report, slos)
+    assert len(violations) == 1 and violations[0].startswith(LIST)
+
+
+def test_check_slos_merges_endpoint_over_default():
+    report = _report(**{GENERATE: (1500.0, 0.5)})
+    slos = {
+        "default": {"p99_ms": 500, "error_rate": 0.01},
+        GENERATE: {"p99_ms": 2000},
+    }
+
+    # The endpoint raises p99 but still inherits the default error_rate gate
+    violations = run.check_slos(report, slos)
+    assert len(violations) == 1 and "error rate" in violations[0]
+
+
+def test_check_regressions_flags_p99_growth_beyond_allowance():
+    baseline = _report(**{GENERATE: (100.0, 0.0), LIST: (100.0, 0.0)})
+    report = _report(**{GENERATE: (119.0, 0.0), LIST: (125.0, 0.0)})
+
+    regressions = run.check_regressions(report, baseline, 0.2)
+    assert len(regressions) == 1 and regressions[0].startswith(LIST)
+
+
+def test_check_regressions_ignores_endpoints_missing_from_baseline():
+    baseline = _report(**{GENERATE: (100.0, 0.0)})
+    report = _report(**{GENERATE: (100.0, 0.0), LIST: (900.0, 0.0)})
+
+    assert run.check_regressions(report, baseline, 0.2) == []
+
+
+def test_baseline_mismatches():
+    metadata = {
+        "scenario_sha256": "abc",
+        "mode": "inprocess",
+        "cpu_count": 1,
+        "executor_workers": 64,
+    }
+    baseline = {"metadata": dict(metadata)}
+    assert run.baseline_mismatches(baseline, metadata) == []
+
+    for key, other in [
+        ("scenario_sha256", "def"),
+        ("mode", "subprocess"),
+        ("cpu_count", 8),
+        ("executor_workers", 32),
+    ]:
+        mismatches = run.baseline_mismatches(baseline, dict(metadata, **{key: other}))
+        assert len(mismatches) == 1, key
+
+
+def test_main_refuses_mismatched_baseline(tmp_path):
+    scenario_path = tmp_path / "scenario.json"
+    scenario_path.write_text('{"name": "x", "mix": {"list": 1}, "stages": []}')
+    baseline_path = tmp_path / "baseline.json"
+    baseline_path.write_text('{"metadata": {"mode": "subprocess"}, "endpoints": {}}')
+
+    # Fails validation (no stages) before the baseline is even considered
+    assert run.main([str(scenario_path), "--baseline", str(baseline_path)]) == 2
+
+    scenario_path.write_text(
+        '{"name": "x", "mix": {"list": 1},'
+        ' "stages": [{"concurrency": 1, "duration_s": 1}]}'
+    )
+    assert run.main([str(scenario_path), "--baseline", str(baseline_path)]) == 3
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"mix": {"lst": 1}},
+        {"mix": {"list": 0}},
+        {"seed_websites": 0},
+        {"stages": []},
+        {"stages": [{"concurrency": 0, "duration_s": 1}]},
+        {"executor_workers": 0},
+    ],
+)
+def test_validate_scenario_rejects_bad_scenarios(overrides):
+    with pytest.raises(ValueError):
+        run.validate_scenario(_scenario(**overrides))
+
+
+def test_loop_lag_monitor_records_blocking():
+    monitor = LoopLagMonitor(interval=0.005)
+
+    async def block_loop():
+        monitor.ensure_running()
+        await asyncio.sleep(0.02)
+        time.sleep(0.05)
+        await asyncio.sleep(0.02)
+        # Draining hands over the samples and starts a fresh buffer
+        return monitor.drain(), monitor.drain()
+
+    samples, after_drain = asyncio.run(block_loop())
+    assert len(samples) >= 2
+    assert max(samples) >= 40
+    assert after_drain == []
+
+
+def test_run_scenario_in_process_smoke():
+    report = asyncio.run(run.run_scenario(_scenario(), "inprocess"))
+
+    assert report["executor_workers"] == 4
+    assert [stage["concurrency"] for stage in report["stages"]] == [1, 3]
+    for stage in report["stages"]:
+        assert stage["requests"] > 0
+        assert "loop_lag_p99_ms" in stage
+    assert report["endpoints"]
+    for endpoint, stats in report["endpoints"].items():
+        assert endpoint in run.ENDPOINTS.values()
+        assert stats["error_rate"] == 0.0
@@ -0,0 +1,222 @@
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from services import model_backends
+from services.model_backends import (
+    CACHE_REFRESH_MARGIN,
+    CACHE_RETRY_BACKOFF,
+    CHARS_PER_TOKEN,
+    MIN_CACHE_TOKENS,
+    FakeBackend,
+    GeminiBackend,
+)
+
+
+def test_fake_backend_bills_prefix_once_per_cache_key():
+    backend = FakeBackend(lambda *_: "ok")
+
+    backend.generate("PREFIX", "first", "greet@1")
+    assert backend.billed_chars == len("PREFIX") + len("first")
+
+    before = backend.billed_chars
+    assert backend.generate("PREFIX", "second!", "greet@1") == "ok"
+    assert backend.billed_chars - before == len("second!")
+
+
+def test_fake_backend_bills_new_version_prefix():
+    backend = FakeBackend()
+    backend.generate("PREFIX", "a", "greet@1")
+
+    before = backend.billed_chars
+    backend.generate("PREFIX v2", "a", "greet@2")
+    assert backend.billed_chars - before == len("PREFIX v2") + len("a")
+
+
+def test_fake_backend_without_cache_bills_full_prompt():
+    backend = FakeBackend(prefix_cache=False)
+    backend.generate("PREFIX", "a", "greet@1")
+    backend.generate("PREFIX", "b", "greet@1")
+
+    assert backend.billed_chars == 2 * (len("PREFIX") + 1)
+
+
+class _Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Model:
+    def __init__(self, result):
+        self.result = result
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return _Response(self.result)
+
+
+class _CachedContent:
+    def __init__(self, name, model):
+        self.name = name
+        self.model = model
+        self.deleted = False
+
+    def delete(self):
+        self.deleted = True
+
+
+class _Caching:
+    """Stands in for genai.caching; every created cache gets its own model"""
+
+    def __init__(self):
+        self.created = []
+        self.errors = []
+        self.result = "cached"
+        self.CachedContent = self
+
+    def create(self, model, display_name, system_instruction, ttl):
+        if self.errors:
+            raise self.errors.pop(0)
+        content = _CachedContent(f"cache-{len(self.created)}", _Model(self.result))
+        self.created.append(content)
+        return content
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+PREFIX = "x" * (MIN_CACHE_TOKENS * CHARS_PER_TOKEN)
+TTL_SECONDS = 3600
+
+
+@pytest.fixture
+def caching(monkeypatch):
+    caching = _Caching()
+    monkeypatch.setattr(model_backends.genai, "caching", caching, raising=False)
+    monkeypatch.setattr(
+        model_backends.genai.GenerativeModel,
+        "from_cached_content",
+        staticmethod(lambda content: content.model),
+        raising=False,
+    )
+    return caching
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(model_backends.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def backend(caching, clock):
+    backend = GeminiBackend("gemini-1.5-flash-001")
+    backend.model = _Model("full")
+    return backend
+
+
+def test_gemini_backend_creates_and_reuses_cache(backend, caching):
+    assert backend.generate(PREFIX, "a", "greet@1") == "cached"
+    assert backend.generate(PREFIX, "b", "greet@1") == "cached"
+
+    assert len(caching.created) == 1
+    assert caching.created[0].model.prompts == ["a", "b"]
+    assert backend.model.prompts == []
+
+
+def test_gemini_backend_skips_short_prefix_and_unversioned_model(caching, clock):
+    backend = GeminiBackend("gemini-1.5-flash-001")
+    backend.model = _Model("full")
+    assert backend.generate("short", "a", "greet@1") == "full"
+
+    unversioned = GeminiBackend("gemini-1.5-flash")
+    unversioned.model = _Model("full")
+    assert unversioned.generate(PREFIX, "a", "greet@1") == "full"
+    assert caching.created == []
+
+
+def test_gemini_backend_refreshes_before_expiry(backend, caching, clock):
+    backend.generate(PREFIX, "a", "greet@1")
+    old = caching.created[0]
+
+    clock.now += TTL_SECONDS - CACHE_REFRESH_MARGIN.total_seconds() + 1
+    backend.generate(PREFIX, "b", "greet@1")
+
+    new = caching.created[1]
+    assert old.deleted and not new.deleted
+    assert new.model.prompts == ["b"]
+
+
+def test_gemini_backend_keeps_old_cache_on_transient_refresh_failure(
+    backend, caching, clock
+):
+    backend.generate(PREFIX, "a", "greet@1")
+    old = caching.created[0]
+
+    clock.now += TTL_SECONDS - CACHE_REFRESH_MARGIN.total_seconds() + 1
+    caching.errors.append(google_exceptions.ServiceUnavailable("503"))
+    assert backend.generate(PREFIX, "b", "greet@1") == "cached"
+    assert old.model.prompts == ["a", "b"]
+    assert not old.deleted
+
+    # No retry within the backoff, then a successful retry replaces the cache
+    backend.generate(PREFIX, "c", "greet@1")
+    assert len(caching.created) == 1
+    clock.now += CACHE_RETRY_BACKOFF.total_seconds()
+    backend.generate(PREFIX, "d", "greet@1")
+    assert len(caching.created) == 2
+    assert old.deleted
+    assert caching.created[1].model.prompts == ["d"]
+
+
+def test_gemini_backend_retries_first_creation_after_transient_failure(
+    backend, caching, clock
+):
+    caching.errors.append(google_exceptions.TooManyRequests("429"))
+    assert backend.generate(PREFIX, "a", "greet@1") == "full"
+    assert backend.model.prompts == [PREFIX + "a"]
+
+    clock.now += CACHE_RETRY_BACKOFF.total_seconds()
+    assert backend.generate(PREFIX, "b", "greet@1") == "cached"
+
+
+def test_gemini_backend_stops_trying_after_permanent_failure(
+    backend, caching, clock
+):
+    caching.errors.append(google_exceptions.InvalidArgument("too small"))
+    assert backend.generate(PREFIX, "a", "greet@1") == "full"
+
+    clock.now += CACHE_RETRY_BACKOFF.total_seconds() * 10
+    assert backend.generate(PREFIX, "b", "greet@1") == "full"
+    assert caching.created == []
+
+
+def test_gemini_backend_does_not_retry_other_errors(backend, caching):
+    caching.result = google_exceptions.ResourceExhausted("429")
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        backend.generate(PREFIX, "a", "greet@1")
+    assert backend.model.prompts == []
+
+    # The cache is kept and used again once the model recovers
+    caching.created[0].model.result = "cached"
+    assert backend.generate(PREFIX, "b", "greet@1") == "cached"
+    assert len(caching.created) == 1
+
+
+def test_gemini_backend_falls_back_when_cache_is_gone(backend, caching):
+    caching.result = google_exceptions.NotFound("expired")
+    assert backend.generate(PREFIX, "a", "greet@1") == "full"
+    assert backend.model.prompts == [PREFIX + "a"]
+
+    caching.result = "cached"
+    assert backend.generate(PREFIX, "b", "greet@1") == "cached"
+    assert len(caching.created) == 2
@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+
+from services.ai_service import GeminiAIService
+from services.model_backends import FakeBackend
+from services.prompts import PromptRegistry, PromptTemplate, prompt_registry
+
+# System prompts exactly as they were inlined in GeminiAIService before the
+# registry existed; the rendered prompts must not change.
+OLD_GENERATE_WEBSITE = """You are an expert web developer. Generate a complete website based on the user's description.
+
+IMPORTANT: Return ONLY a valid JSON object with this exact structure (no additional text before or after):
+
+{
+  "pages": [
+    {
+      "name": "Home",
+      "slug": "home",
+      "html": "complete HTML with inline CSS",
+      "description": "Brief description of the page"
+    }
+  ]
+}
+
+Guidelines for HTML generation:
+- Create modern, responsive HTML with inline CSS
+- Use semantic HTML5 elements (header, nav, main, section, footer)
+- Include proper meta tags and viewport
+- Make it visually appealing with good typography and spacing
+- Use CSS Grid/Flexbox for layouts
+- Include hover effects and smooth transitions
+- Make text content relevant to the description
+- Ensure mobile-responsive design
+- Use modern color schemes and gradients
+- Include proper spacing and typography
+- Create multiple pages based on the description (typically 3-5 pages)
+
+Example page types to include based on description:
+- Home/Landing page
+- About/Services page  
+- Contact page
+- Portfolio/Gallery (if relevant)
+- Products/Menu (if relevant)
+- Blog/News (if relevant)
+
+Make the content realistic and relevant to the described business/purpose."""
+
+OLD_EDIT_PAGE = """You are an expert web developer. Edit the provided HTML/CSS based on the user's instruction.
+
+IMPORTANT: Return ONLY the updated HTML with inline CSS (no additional text before or after).
+
+Guidelines:
+- Maintain responsive design
+- Keep existing content unless specifically asked to change it
+- Apply modern web design principles
+- Ensure the changes are visually appealing
+- Preserve the overall structure and functionality
+- Make sure all CSS is inline within the HTML
+- Keep semantic HTML5 structure"""
+
+OLD_GENERATE_PAGE = """You are an expert web developer. Generate a single HTML page based on the description.
+
+IMPORTANT: Return ONLY the complete HTML with inline CSS (no additional text before or after).
+
+Guidelines:
+- Create modern, responsive HTML with inline CSS
+- Use semantic HTML5 elements
+- Include proper meta tags and viewport
+- Make it visually appealing with good typography and spacing
+- Use CSS Grid/Flexbox for layouts
+- Include hover effects and transitions
+- Ensure mobile-responsive design
+- Use modern color schemes
+- Make content relevant to the page purpose"""
+
+OLD_OPTIMIZE_SEO = """You are an SEO expert. Optimize the provided HTML for search engines.
+
+IMPORTANT: Return ONLY the optimized HTML (no additional text before or after).
+
+SEO optimizations to apply:
+- Add/improve meta description
+- Add proper title tag
+- Add meta keywords (if missing)
+- Ensure proper heading hierarchy (h1, h2, h3)
+- Add alt attributes to images
+- Optimize for page speed
+- Add structured data if relevant
+- Ensure semantic HTML structure
+- Add Open Graph tags for social sharing"""
+
+# Values with braces make sure user input is never re-parsed as a template
+DESCRIPTION = "A {coffee} shop"
+HTML = "<style>body { color: red; }</style><p>{name}</p>"
+
+
+def _sent_prompt(backend: FakeBackend) -> str:
+    call = backend.calls[-1]
+    return call["prefix"] + call["suffix"]
+
+
+def test_generate_website_prompt_is_unchanged():
+    backend = FakeBackend(lambda *_: '{"pages": []}')
+    asyncio.run(GeminiAIService(backend=backend).generate_website(DESCRIPTION))
+
+    user_prompt = f"Create a website: {DESCRIPTION}"
+    assert _sent_prompt(backend) == (
+        f"{OLD_GENERATE_WEBSITE}\n\nUser Request: {user_prompt}"
+    )
+
+
+def test_edit_page_prompt_is_unchanged():
+    backend = FakeBackend(lambda *_: "<p>edited</p>")
+    pages = [{"name": "Home", "slug": "home", "html": HTML, "description": ""}]
+    asyncio.run(
+        GeminiAIService(backend=backend).edit_page(pages, "home", "Make it {blue}")
+    )
+
+    user_prompt = f"""Current HTML:
+{HTML}
+
+Edit instruction: Make it {{blue}}
+
+Return the complete updated HTML:"""
+    assert _sent_prompt(backend) == f"{OLD_EDIT_PAGE}\n\n{user_prompt}"
+
+
+def test_generate_page_prompt_is_unchanged():
+    backend = FakeBackend(lambda *_: "<p>page</p>")
+    asyncio.run(
+        GeminiAIService(backend=backend).generate_page("About", DESCRIPTION, "ctx")
+    )
+
+    user_prompt = f"""Page Name: About
+Page Description: {DESCRIPTION}
+Website Context: ctx
+
+Generate a complete HTML page:"""
+    assert _sent_prompt(backend) == f"{OLD_GENERATE_PAGE}\n\n{user_prompt}"
+
+
+def test_optimize_seo_prompt_is_unchanged():
+    backend = FakeBackend(lambda *_: "<p>seo</p>")
+    asyncio.run(
+        GeminiAIService(backend=backend).optimize_seo(HTML, "Home", DESCRIPTION)
+    )
+
+    user_prompt = f"""Page Name: Home
+Description: {DESCRIPTION}
+
+HTML to optimize:
+{HTML}
+
+Return the SEO-optimized HTML:"""
+    assert _sent_prompt(backend) == f"{OLD_OPTIMIZE_SEO}\n\n{user_prompt}"
+
+
+def test_version_bump_changes_cache_key():
+    registry = PromptRegistry()
+    v1 = registry.register(PromptTemplate("greet", "1", "Be kind.", "Hi {name}"))
+    v2 = registry.register(PromptTemplate("greet", "2", "Be brief.", "Hi {name}"))
+
+    assert v1.cache_key != v2.cache_key
+    assert registry.get("greet") is v2
+    assert registry.get("greet", "1") is v1
+    assert registry.versions("greet") == ["1", "2"]
+
+
+def test_register_rejects_duplicate_version():
+    registry = PromptRegistry()
+    registry.register(PromptTemplate("greet", "1", "Be kind.", "Hi {name}"))
+
+    with pytest.raises(ValueError):
+        registry.register(PromptTemplate("greet", "1", "Be rude.", "Hi {name}"))
+    assert registry.get("greet").system == "Be kind."
+
+
+@pytest.mark.parametrize("user", ["{a!r}", "{a:>5}", "{a.b}", "{a[0]}", "{}", "{0}"])
+def test_unsupported_fields_are_rejected(user):
+    with pytest.raises(ValueError):
+        PromptTemplate("bad", "1", "system", user)
+
+
+def test_registered_prompts_render_with_plain_fields():
+    template = prompt_registry.get("generate_website")
+    assert template.render_suffix(description="x") == (
+        "User Request: Create a website: x"
+    )
+
+
+@pytest.mark.parametrize(
+    "user",
+    [
+        "",
+        "no fields",
+        "x {{literal}} {a}",
+        "quotes ' \" and \\ backslash {a}{b}",
+        "{a}\n{a} {b}}}",
+    ],
+)
+def test_render_suffix_matches_str_format(user):
+    template = PromptTemplate("t", "1", "system", user)
+    values = {"a": "{b}", "b": "it's \\ {{x}}"}
+    used = {name: values[name] for name in ("a", "b") if "{" + name + "}" in user}
+    assert template.render_suffix(**used) == user.format(**used)
+
+
+def test_keyword_field_is_rejected():
+    with pytest.raises(ValueError):
+        PromptTemplate("bad", "1", "system", "{class}")